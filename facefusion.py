@@ -1,26 +1,30 @@
 #!/usr/bin/env python3
+# 线程数限制必须先于任何可能拉起 numpy/onnxruntime 的导入生效，
+# 否则 OMP/BLAS 线程池会按默认核数初始化（os/sys 不拉线程池，可在其后）
 import os
-import time
-
-import pyfiglet
-
-# 清屏（可选）
-os.system("cls" if os.name == "nt" else "clear")
-
-# 标题大字
-big_text = pyfiglet.figlet_format("FaceFusionFree", font="slant")
-
-# 构建展示块
-banner = ""
-
-print()
-print(banner)
-print("\n" + "═" * 80 + "\n")
-time.sleep(5)
-
-os.environ["OMP_NUM_THREADS"] = "1"
-
-from facefusion import core
+import sys
+
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("MKL_NUM_THREADS", "1")
+os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+
+# 预先渲染好的标题（pyfiglet slant 字体输出），免去每次启动的字体解析
+_BANNER = r"""
+    ______                ______           _             ______
+   / ____/___ _________  / ____/_  _______(_)___  ____  / ____/_______  ___
+  / /_  / __ `/ ___/ _ \/ /_  / / / / ___/ / __ \/ __ \/ /_  / ___/ _ \/ _ \
+ / __/ / /_/ / /__/  __/ __/ / /_/ (__  ) / /_/ / / / / __/ / /  /  __/  __/
+/_/    \__,_/\___/\___/_/    \__,_/____/_/\____/_/ /_/_/   /_/   \___/\___/
+"""
+
+# 清屏（仅交互终端，避免无谓的子进程开销）
+if sys.stdout.isatty():
+    os.system("cls" if os.name == "nt" else "clear")
+    print(_BANNER)
+    print("\n" + "═" * 80 + "\n")
 
 if __name__ == "__main__":
+    # 延迟导入：core 会拉起 ONNX/gradio 等重依赖，仅在真正运行时才加载
+    from facefusion import core
+
     core.cli()
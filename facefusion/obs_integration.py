@@ -7,6 +7,7 @@
 - 简化异常处理，不做额外环境防御或冗余检查。
 """
 
+import time
 from pathlib import Path
 from typing import Optional
 
@@ -19,6 +20,60 @@ def create_client(host: str, port: int, password: str) -> obs.ReqClient:
     return client
 
 
+# 输入源名称解析缓存：(客户端id, kind, 位置) -> inputName，省去每次绑定的一次 WS 往返
+_input_name_cache: dict = {}
+
+
+class _InputListCache:
+    """
+    get_input_list 响应的短 TTL 缓存。
+    “绑定 URL → 换视频 → 切黑白”这类连续操作共享一次往返；
+    set_input_settings 之后主动失效，保证用户可见的新鲜度。
+    """
+
+    def __init__(self, ttl_seconds: float = 2.0) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict = {}
+
+    def get(self, client: obs.ReqClient, kind: Optional[str] = None) -> list:
+        key = (id(client), kind)
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry and now - entry[0] < self.ttl_seconds:
+            return entry[1]
+        if kind is not None:
+            inputs = client.get_input_list(kind=kind).inputs
+        else:
+            inputs = client.get_input_list().inputs
+        self._entries[key] = (now, inputs)
+        return inputs
+
+    def invalidate(self) -> None:
+        self._entries.clear()
+
+
+_input_list_cache = _InputListCache()
+
+
+def invalidate_input_cache() -> None:
+    """清空输入源相关缓存（连接/断开时调用）。"""
+    _input_name_cache.clear()
+    _input_list_cache.invalidate()
+
+
+def _resolve_input_name(client: obs.ReqClient, kind: str, position: int) -> Optional[str]:
+    key = (id(client), kind, position)
+    name = _input_name_cache.get(key)
+    if name is not None:
+        return name
+    inputs = _input_list_cache.get(client, kind)
+    if not inputs:
+        return None
+    name = inputs[position]["inputName"]
+    _input_name_cache[key] = name
+    return name
+
+
 def disconnect_client(client: Optional[obs.ReqClient]) -> None:
     """断开并清理客户端（若已连接）。"""
     if client is not None:
@@ -36,18 +91,17 @@ def update_first_video_source_file(
     更新第一个 ffmpeg_source 输入的本地文件路径。
     与 fake_facefusion/obs.py 保持完全一致的接口与行为。
     """
-    response = client.get_input_list(kind="ffmpeg_source")
-    inputs = response.inputs
     video_abs_path = str(Path(new_file_path).absolute())
+    input_name = _resolve_input_name(client, "ffmpeg_source", 0)
 
-    if inputs:
-        input_name = inputs[0]["inputName"]
+    if input_name:
         client.set_input_settings(
             # TODO： 更灵活的配置，支持自定义输入源名称
             name="背景",
             settings={"local_file": video_abs_path},
             overlay=reinitialize,
         )
+        _input_list_cache.invalidate()
         return True
     return False
 
@@ -59,16 +113,15 @@ def update_first_browser_source_url(
     更新第一个 browser_source 输入的 URL 设置。
     调用 obsws-python 标准 API：get_input_list + set_input_settings。
     """
-    response = client.get_input_list(kind="ffmpeg_source")
-    inputs = response.inputs
-    if inputs:
-        input_name = inputs[-1]["inputName"]
+    input_name = _resolve_input_name(client, "ffmpeg_source", -1)
+    if input_name:
         client.set_input_settings(
             # TODO： 更灵活的配置，支持自定义输入源名称
             name="换脸视频流",
             settings={"input": url, "is_local_file": False},
             overlay=reinitialize,
         )
+        _input_list_cache.invalidate()
         return True
     return False
 
@@ -84,14 +137,11 @@ def change_heibai_state(client: obs.ReqClient) -> bool|None:
     """
     遍历所有输入源，查找名为“黑白”的滤镜，将其启用状态取反。
     如果该滤镜当前是启用的，则禁用；如果禁用，则启用。
+    找到第一个匹配的滤镜后立即返回，后续输入源不再产生往返请求。
     """
-    input_response = client.get_input_list()
-
-    for input_info in input_response.inputs:
-        input_name = input_info["inputName"]
-
-        final_enabled = None
-        try:
+    try:
+        for input_info in _input_list_cache.get(client):
+            input_name = input_info["inputName"]
             # 获取该输入源的所有滤镜
             filters_response = client.get_source_filter_list(name=input_name)
             for f in filters_response.filters:
@@ -104,7 +154,7 @@ def change_heibai_state(client: obs.ReqClient) -> bool|None:
                         filter_name="黑白",
                         enabled=not enabled
                     )
-                    final_enabled = not enabled
-            return final_enabled
-        except obs.error.OBSSDKError:
-            return None
\ No newline at end of file
+                    return not enabled
+        return None
+    except obs.error.OBSSDKError:
+        return None
\ No newline at end of file
@@ -22,6 +22,12 @@ def multi_process_capture(
     camera_capture: cv2.VideoCapture, camera_fps: Fps
 ) -> Generator[VisionFrame, None, None]:
     capture_deque: Deque[VisionFrame] = deque()
+    # 驱动实际帧率高于目标帧率时多余帧只 grab() 出队不解码，
+    # retrieve()（含 MJPG 解码）只花在真正要处理的帧上
+    native_fps = camera_capture.get(cv2.CAP_PROP_FPS) or 0
+    skip_count = (
+        max(1, int(native_fps / camera_fps)) if native_fps > camera_fps > 0 else 1
+    )
 
     with tqdm(
         desc=wording.get("streaming"),
@@ -34,6 +40,8 @@ def multi_process_capture(
             futures = []
 
             while camera_capture and camera_capture.isOpened():
+                for _ in range(skip_count - 1):
+                    camera_capture.grab()
                 _, capture_frame = camera_capture.read()
                 if analyse_stream(capture_frame, camera_fps):
                     camera_capture.release()
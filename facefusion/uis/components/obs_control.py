@@ -1,13 +1,17 @@
+import asyncio
+import copy
+import os
+import time
 import gradio as gr
 from typing import Optional
 from pathlib import Path
-import json
+import orjson
 
-from facefusion import logger
 from facefusion.obs_integration import (
     change_heibai_state,
     create_client,
     disconnect_client,
+    invalidate_input_cache,
     update_first_browser_source_url,
     update_first_video_source_file,
     default_mjpeg_url,
@@ -16,11 +20,27 @@ import obsws_python as obs
 
 
 _client: Optional[obs.ReqClient] = None  # type: ignore
+_client_last_used: float = 0.0
+
+# 空闲超过该时长（秒）则主动关闭并重建连接，避免长期挂着半死的 socket
+CLIENT_IDLE_TTL = 300.0
 
 SETTINGS_PATH = Path(".temp/facefusion/obs_settings.json")
 
+# 内存缓存：(mtime_ns, settings)，避免每次 UI 事件都重新读盘解析
+_settings_cache: Optional[tuple[int, dict]] = None
+
+# 背景视频目录扫描缓存：(目录 mtime_ns, 文件列表)
+_bgs_cache: Optional[tuple[int, list[str]]] = None
+
+# 上一次推送给 Gallery 的列表：未变化时返回空更新，省去前端重渲染
+_last_gallery: list[str] = []
+
+_VIDEO_EXTS = frozenset({".mp4", ".avi", ".mov", ".mkv", ".wmv", ".flv", ".webm"})
+
 
 def _load_settings() -> dict:
+    global _settings_cache
     default = {
         "host": "127.0.0.1",
         "port": 4455,
@@ -28,17 +48,21 @@ def _load_settings() -> dict:
         "url": default_mjpeg_url(),
     }
     try:
-        if SETTINGS_PATH.exists():
-            with SETTINGS_PATH.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-                default.update(
-                    {
-                        "host": data.get("host", default["host"]),
-                        "port": int(data.get("port", default["port"])),
-                        "password": data.get("password", default["password"]),
-                        "url": data.get("url", default["url"]),
-                    }
-                )
+        stat = SETTINGS_PATH.stat()
+        if _settings_cache and _settings_cache[0] == stat.st_mtime_ns:
+            return copy.copy(_settings_cache[1])
+        with SETTINGS_PATH.open("rb") as f:
+            data = orjson.loads(f.read())
+            default.update(
+                {
+                    "host": data.get("host", default["host"]),
+                    "port": int(data.get("port", default["port"])),
+                    "password": data.get("password", default["password"]),
+                    "url": data.get("url", default["url"]),
+                }
+            )
+        _settings_cache = (stat.st_mtime_ns, default)
+        return copy.copy(default)
     except Exception:
         # 保持简洁：读取失败则回退默认
         pass
@@ -46,24 +70,63 @@ def _load_settings() -> dict:
 
 
 def _save_settings(host: str, port: int, password: str, url: str) -> None:
+    global _settings_cache
     try:
+        settings = {"host": host, "port": int(port), "password": password, "url": url}
+        # 内容未变化则跳过写盘
+        if _settings_cache and _settings_cache[1] == settings:
+            return
         SETTINGS_PATH.parent.mkdir(parents=True, exist_ok=True)
-        with SETTINGS_PATH.open("w", encoding="utf-8") as f:
-            json.dump(
-                {"host": host, "port": int(port), "password": password, "url": url},
-                f,
-                ensure_ascii=False,
-                indent=2,
-            )
+        # 先写临时文件再原子替换，崩溃时不会留下半截 JSON
+        tmp_path = SETTINGS_PATH.with_suffix(".json.tmp")
+        with tmp_path.open("wb") as f:
+            f.write(orjson.dumps(settings, option=orjson.OPT_INDENT_2))
+        os.replace(tmp_path, SETTINGS_PATH)
+        # 写盘后直接回填缓存，省去下一次读盘
+        _settings_cache = (SETTINGS_PATH.stat().st_mtime_ns, settings)
     except Exception:
         # 简化异常：保存失败不抛出到 UI
         pass
 
 
-def _do_connect(host: str, port: int, password: str, url: str) -> str:
-    global _client
+def _ensure_client() -> Optional[obs.ReqClient]:  # type: ignore
+    """复用全局客户端：健康探测失败或空闲超时则用最近保存的设置懒重连。"""
+    global _client, _client_last_used
+    now = time.monotonic()
+    if _client is not None:
+        if now - _client_last_used > CLIENT_IDLE_TTL:
+            disconnect_client(_client)
+            _client = None
+        else:
+            try:
+                _client.get_version()
+                _client_last_used = now
+                return _client
+            except Exception:
+                disconnect_client(_client)
+                _client = None
+        # 缓存按 id(client) 作键，旧对象释放后 id 可能被新客户端复用，
+        # 丢弃客户端时必须同步清缓存，避免新连接命中上一会话的条目
+        invalidate_input_cache()
     try:
-        _client = create_client(host, port, password)
+        settings = _load_settings()
+        _client = create_client(
+            settings["host"], int(settings["port"]), settings["password"]
+        )
+        _client_last_used = now
+        return _client
+    except Exception:
+        _client = None
+        return None
+
+
+async def _do_connect(host: str, port: int, password: str, url: str) -> str:
+    # OBS WebSocket 往返为纯 I/O 等待，放到线程里执行，避免阻塞事件循环
+    global _client, _client_last_used
+    try:
+        invalidate_input_cache()
+        _client = await asyncio.to_thread(create_client, host, port, password)
+        _client_last_used = time.monotonic()
         _save_settings(host, port, password, url)
         return "✅ 连接成功"
     except Exception as e:
@@ -71,28 +134,23 @@ def _do_connect(host: str, port: int, password: str, url: str) -> str:
         return f"❌ 连接失败：{e}"
 
 
-def _do_disconnect() -> str:
+async def _do_disconnect() -> str:
     global _client
-    disconnect_client(_client)
+    await asyncio.to_thread(disconnect_client, _client)
     _client = None
+    invalidate_input_cache()
     return "ℹ️ 已断开连接"
 
 
-def _do_bind(url: str) -> str:
-    if _client is None:
+async def _do_bind(url: str) -> str:
+    client = await asyncio.to_thread(_ensure_client)
+    if client is None:
         return "❌ 未连接 OBS"
     try:
-        ok = update_first_browser_source_url(_client, url)
+        ok = await asyncio.to_thread(update_first_browser_source_url, client, url)
         # 绑定成功也保存当前 URL（保持与连接参数一致的持久化）
         try:
-            if SETTINGS_PATH.exists():
-                data = _load_settings()
-                _save_settings(
-                    data.get("host", "127.0.0.1"),
-                    int(data.get("port", 4455)),
-                    data.get("password", ""),
-                    url,
-                )
+            _update_url(url)
         except Exception:
             pass
         return (
@@ -102,15 +160,24 @@ def _do_bind(url: str) -> str:
         return f"❌ 绑定失败：{e}"
 
 
+def _update_url(url: str) -> None:
+    """仅持久化 url 字段：其余字段来自 mtime 缓存，不触发额外读盘。"""
+    settings = _load_settings()
+    _save_settings(
+        settings["host"], int(settings["port"]), settings["password"], url
+    )
+
+
 def _do_save(host: str, port: int, password: str, url: str) -> str:
     _save_settings(host, port, password, url)
     return "✅ 已保存设置"
 
 
-def _change_bw() -> str:
-    if _client is None:
+async def _change_bw() -> str:
+    client = await asyncio.to_thread(_ensure_client)
+    if client is None:
         return "❌ 未连接 OBS"
-    ok = change_heibai_state(_client)
+    ok = await asyncio.to_thread(change_heibai_state, client)
     if ok is None:
         return "❌ 更新出错"
     return "✅ 已应用黑白效果" if ok else "✅ 已关闭黑白效果"
@@ -162,22 +229,45 @@ def render() -> None:
 
         # —— B 阶段：迁移假工程的背景视频控制界面到此面板 ——
         def _get_video_files() -> list[str]:
+            global _bgs_cache
             bgs_path = Path("fake_facefusion/bgs")
-            if not bgs_path.exists():
+            try:
+                stat = bgs_path.stat()
+            except OSError:
                 return []
-            video_extensions = {".mp4", ".avi", ".mov", ".mkv", ".wmv", ".flv", ".webm"}
+            # 目录未变化时直接复用上次扫描结果，刷新按钮近乎零开销
+            if _bgs_cache and _bgs_cache[0] == stat.st_mtime_ns:
+                return _bgs_cache[1]
+            # os.scandir 复用目录项自带的类型信息，避免 rglob 的逐文件 stat
             files: list[str] = []
-            for fp in bgs_path.rglob("*"):
-                if fp.is_file() and fp.suffix.lower() in video_extensions:
-                    files.append(str(fp.absolute()))
+            stack = [os.fspath(bgs_path)]
+            while stack:
+                current = stack.pop()
+                try:
+                    with os.scandir(current) as entries:
+                        for entry in entries:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif (
+                                entry.is_file(follow_symlinks=False)
+                                and os.path.splitext(entry.name)[1].lower()
+                                in _VIDEO_EXTS
+                            ):
+                                files.append(os.path.abspath(entry.path))
+                except OSError:
+                    pass
+            _bgs_cache = (stat.st_mtime_ns, files)
             return files
 
         with gr.Row():
             gr.Markdown("## 背景视频控制（迁移自 fake_facefusion/gradio_demo.py）")
 
+        global _last_gallery
+        _last_gallery = _get_video_files()
+
         with gr.Row():
             gallery = gr.Gallery(
-                value=_get_video_files(),
+                value=_last_gallery,
                 label="选择视频文件",
                 show_label=True,
                 columns=4,
@@ -192,11 +282,12 @@ def render() -> None:
             refresh_btn = gr.Button("🔄 刷新视频列表", variant="secondary")
             refresh_result = gr.Textbox(label="刷新结果", interactive=False)
 
-        def _on_video_select(evt: gr.SelectData, req: gr.Request) -> str:
+        async def _on_video_select(evt: gr.SelectData, req: gr.Request) -> str:
             try:
                 client_ip = req.client.host
                 print(client_ip)
-                if _client is None:
+                client = await asyncio.to_thread(_ensure_client)
+                if client is None:
                     return "❌ 未连接 OBS"
                 selected = evt.value
                 file_path: Optional[str] = None
@@ -217,7 +308,9 @@ def render() -> None:
                     video_name = Path(file_path).name
                     temp_path = Path("D:\\fake_facefusion\\bgs") / video_name
                     file_path = str(temp_path)
-                ok = update_first_video_source_file(_client, file_path)
+                ok = await asyncio.to_thread(
+                    update_first_video_source_file, client, file_path
+                )
                 if ok:
                     return f"✅ 成功更新 OBS 视频源: {Path(file_path).name}"
                 else:
@@ -226,7 +319,11 @@ def render() -> None:
                 return f"❌ 错误：{e}"
 
         def _refresh_videos():
+            global _last_gallery
             files = _get_video_files()
+            if files == _last_gallery:
+                return gr.update(), "ℹ️ 无变化"
+            _last_gallery = files
             return files, ("✅ 视频列表已刷新" if files else "⚠️ 未找到视频文件")
 
         gallery.select(fn=_on_video_select, outputs=video_result)
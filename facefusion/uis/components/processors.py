@@ -1,3 +1,5 @@
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Tuple
 import gradio  # 保持你项目原本的用法
 
@@ -22,10 +24,20 @@ PROCESSOR_LABELS = {
 PROCESSORS_CHECKBOX_GROUP: Optional[gradio.CheckboxGroup] = None
 
 
+@functools.lru_cache(maxsize=1)
+def _available_ids_cached() -> Tuple[str, ...]:
+    # 按磁盘扫描顺序，保持原项目行为；进程内模块列表不会变化，缓存一次即可
+    # return tuple(get_file_name(p) for p in resolve_file_paths('facefusion/processors/modules'))
+    return ("face_swapper", "deep_swapper")
+
+
+@functools.lru_cache(maxsize=1)
+def _available_ids_set() -> frozenset:
+    return frozenset(_available_ids_cached())
+
+
 def _available_ids() -> List[str]:
-    # 按磁盘扫描顺序，保持原项目行为
-    # return [get_file_name(p) for p in resolve_file_paths('facefusion/processors/modules')]
-    return ["face_swapper", "deep_swapper"]
+    return list(_available_ids_cached())
 
 
 def _current_ids() -> List[str]:
@@ -51,6 +63,24 @@ def _ordered_ids(selected_ids: List[str], available_ids: List[str]) -> List[str]
     return out
 
 
+@functools.lru_cache(maxsize=1)
+def _choice_by_id() -> dict:
+    # (label, value) 元组只构建一次；覆盖已知标签与扫描到的全部ID，后续按ID直取
+    choices = {pid: (label, pid) for pid, label in PROCESSOR_LABELS.items()}
+    for pid in _available_ids_cached():
+        choices.setdefault(pid, (pid, pid))
+    return choices
+
+
+@functools.lru_cache(maxsize=64)
+def _make_choices_cached(
+    selected_ids: Tuple[str, ...], available_ids: Tuple[str, ...]
+) -> Tuple[Tuple[str, str], ...]:
+    ordered = _ordered_ids(list(selected_ids), list(available_ids))
+    choice_by_id = _choice_by_id()
+    return tuple(choice_by_id.get(pid) or (pid, pid) for pid in ordered)
+
+
 def _make_choices(
     selected_ids: List[str], available_ids: List[str]
 ) -> List[Tuple[str, str]]:
@@ -58,9 +88,9 @@ def _make_choices(
     返回 (label, value)：
     - label 显示中文
     - value 永远是内部ID（避免“值不在 choices 里”的问题）
+    同一组输入的结果走 lru_cache，避免重复渲染时反复构建。
     """
-    ordered = _ordered_ids(selected_ids, available_ids)
-    return [(PROCESSOR_LABELS.get(pid, pid), pid) for pid in ordered]
+    return list(_make_choices_cached(tuple(selected_ids or []), tuple(available_ids)))
 
 
 def render() -> None:
@@ -91,34 +121,43 @@ def update_processors(new_selected_ids: List[str]):
     Gradio 传入的是内部ID列表（因为 choices 用的是 (label, value)）。
     仅对“新增”的做 pre_check，失败只回滚那几个；不新建组件，返回 gr.update。
     """
-    all_ids_list = _available_ids()
-    all_ids = set(all_ids_list)
+    all_ids_list = _available_ids_cached()
+    all_ids = _available_ids_set()
+
+    # 选择未变化（幂等重选/事件重放）时直接返回空更新，跳过预检与清理
+    new_set = set(new_selected_ids or [])
+    if new_set == set(_current_ids()) and new_set.issubset(all_ids):
+        return gradio.update()
 
     # 过滤无效ID
     new_selected_ids = [x for x in (new_selected_ids or []) if x in all_ids]
     old_ids = _current_ids()
+    old_set = set(old_ids)
 
-    # 只对新增做预检
-    added = [x for x in new_selected_ids if x not in old_ids]
+    # 只对新增做预检；pre_check 多为下载/探测等 I/O，并行等待而非串行累加
+    added = [x for x in new_selected_ids if x not in old_set]
     failed: List[str] = []
-    for pid in added:
-        ok = True
-        for m in get_processors_modules([pid]):
+    if added:
+
+        def _pre_check(pid: str) -> Tuple[str, bool]:
             try:
-                if hasattr(m, "pre_check") and not m.pre_check():
-                    ok = False
-                    break
+                for m in get_processors_modules([pid]):
+                    if hasattr(m, "pre_check") and not m.pre_check():
+                        return pid, False
             except Exception:
-                ok = False
-                break
-        if not ok:
-            failed.append(pid)
+                return pid, False
+            return pid, True
+
+        with ThreadPoolExecutor(max_workers=min(8, len(added))) as executor:
+            failed = [pid for pid, ok in executor.map(_pre_check, added) if not ok]
 
     # 去掉预检失败的新增项
-    final_ids = [x for x in new_selected_ids if x not in failed]
+    failed_set = set(failed)
+    final_ids = [x for x in new_selected_ids if x not in failed_set]
+    final_set = set(final_ids)
 
     # 清理被移除的
-    removed = [x for x in old_ids if x not in final_ids]
+    removed = [x for x in old_ids if x not in final_set]
     for m in get_processors_modules(removed):
         if hasattr(m, "clear_inference_pool"):
             try:
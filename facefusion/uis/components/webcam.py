@@ -1,14 +1,25 @@
 from typing import Generator, List, Optional, Tuple, Union
+import functools
+import hashlib
+import heapq
 import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 from typing import Any
 import json
+import queue
+import re
+import shutil
+import threading
 import zipfile
 from uuid import uuid4
 import json
 
 import cv2
 import gradio
+import numpy
 
 from facefusion import state_manager, wording
 from facefusion.camera_manager import clear_camera_pool, get_local_camera_capture
@@ -18,11 +29,15 @@ from facefusion.types import Fps, VisionFrame, WebcamMode
 from facefusion.uis.core import get_ui_component
 from facefusion.uis.types import File
 from facefusion.vision import unpack_resolution
-from facefusion.uis.monitor_integration import save_latest_frame
+from facefusion.uis.monitor_integration import (
+    MONITOR_FRAME_INTERVAL_SEC,
+    save_latest_frame_bgr,
+)
 
 SOURCE_FILE: Optional[gradio.File] = None
 SOURCE_DIR_UPLOAD: Optional[gradio.File] = None
 SOURCE_GALLERY: Optional[gradio.Gallery] = None
+GALLERY_MORE_BUTTON: Optional[gradio.Button] = None
 WEBCAM_IMAGE: Optional[gradio.Image] = None
 WEBCAM_START_BUTTON: Optional[gradio.Button] = None
 WEBCAM_STOP_BUTTON: Optional[gradio.Button] = None
@@ -31,11 +46,24 @@ GALLERY_EVT_DEBUG: Optional[gradio.Textbox] = None
 DIR_UPLOAD_DEBUG: Optional[gradio.Textbox] = None
 DEBUG_TOGGLE: Optional[gradio.Checkbox] = None
 
+# 复用单个 JSON 编码器实例输出调试文本（紧凑分隔符，不做 pretty-print）
+_DEBUG_ENCODE = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+# 监视器帧发布限速：与 MJPEG 路由的推流帧率对齐，超出的帧消费端也用不上
+_last_save_ts = 0.0
+_MIN_SAVE_INTERVAL = MONITOR_FRAME_INTERVAL_SEC
+
+
+def _debug_enabled() -> bool:
+    # get_item 对缺失键返回 None，不抛异常；调用处无需 try/except
+    return bool(state_manager.get_item("debug_enabled"))
+
 
 def render() -> None:
     global SOURCE_FILE
     global SOURCE_DIR_UPLOAD
     global SOURCE_GALLERY
+    global GALLERY_MORE_BUTTON
     global WEBCAM_IMAGE
     global WEBCAM_START_BUTTON
     global WEBCAM_STOP_BUTTON
@@ -56,35 +84,13 @@ def render() -> None:
     with gradio.Row() as IMAGE_UPLOAD_PANEL:
         with gradio.Column():
             # 计算初始可见性（目录与调试开关），Gallery 默认不显示，且移出当前 Row
-            try:
-                debug_enabled_default = bool(
-                    state_manager.get_item("debug_enabled") or False
-                )
-            except Exception:
-                debug_enabled_default = False
+            debug_enabled_default = _debug_enabled()
 
-            # 可见性规则调整：
+            # 可见性规则：
             # - Gallery 默认隐藏，文件夹上传成功后再显示；且不在此 Row
-            # - 目录与调试开关按之前逻辑：
-            #   - debug=true → 显示目录与调试开关
-            #   - debug=false 且已有文件上传 → 隐藏目录与调试开关
-            #   - 其他情况 → 显示目录与调试开关
-            show_dir = True
-            show_toggle = True
-            try:
-                if debug_enabled_default:
-                    show_dir = True
-                    show_toggle = True
-                elif has_source_image:
-                    show_dir = False
-                    show_toggle = False
-                else:
-                    show_dir = True
-                    show_toggle = True
-            except Exception:
-                # 遇到读取状态异常，回退到默认显示
-                show_dir = True
-                show_toggle = True
+            # - 目录与调试开关：debug 开启或尚无已上传文件时显示
+            show_dir = debug_enabled_default or not has_source_image
+            show_toggle = show_dir
 
             SOURCE_DIR_UPLOAD = gradio.File(
                 label="选择文件夹",
@@ -107,6 +113,8 @@ def render() -> None:
         height=420,  # 增加高度，让每张人脸更大
         visible=False,
     )
+    # 分页加载：大目录只先发一页缩略图，点击后按页追加
+    GALLERY_MORE_BUTTON = gradio.Button("加载更多图片", size="sm", visible=False)
     initial_paths = state_manager.get_item("source_paths") if has_source_image else None
     initial_display = initial_paths[0] if initial_paths else ""
     with gradio.Column() as DEBUG_PANEL:
@@ -152,7 +160,17 @@ def listen() -> None:
         SOURCE_DIR_UPLOAD.change(
             update_gallery_from_dir_upload,
             inputs=SOURCE_DIR_UPLOAD,
-            outputs=[SOURCE_GALLERY, DIR_UPLOAD_DEBUG, SOURCE_DIR_UPLOAD, DEBUG_TOGGLE],
+            outputs=[
+                SOURCE_GALLERY,
+                DIR_UPLOAD_DEBUG,
+                SOURCE_DIR_UPLOAD,
+                DEBUG_TOGGLE,
+                GALLERY_MORE_BUTTON,
+            ],
+        )
+    if GALLERY_MORE_BUTTON and SOURCE_GALLERY:
+        GALLERY_MORE_BUTTON.click(
+            on_gallery_more, outputs=[SOURCE_GALLERY, GALLERY_MORE_BUTTON]
         )
     # 调试开关事件：切换调试组件可见性并持久化
     if DEBUG_TOGGLE:
@@ -206,9 +224,10 @@ def listen() -> None:
             outputs=WEBCAM_IMAGE,
         )
         start_event.then(pre_stop)
-        WEBCAM_STOP_BUTTON.click(stop, cancels=start_event, outputs=WEBCAM_IMAGE)
+        # 单次点击只发一个请求：停止采集与按钮复位合并为一个回调
         WEBCAM_STOP_BUTTON.click(
-            pre_stop,
+            stop_and_pre_stop,
+            cancels=start_event,
             outputs=[
                 SOURCE_FILE,
                 WEBCAM_IMAGE,
@@ -218,162 +237,325 @@ def listen() -> None:
         )
 
 
+def _set_source_paths(source_paths: Optional[List[str]]) -> None:
+    # Gradio 重渲染会重发 change 事件；值未变化时不触发状态写入
+    current = state_manager.get_item("source_paths")
+    if source_paths:
+        if current != source_paths:
+            state_manager.set_item("source_paths", source_paths)
+    elif current:
+        state_manager.clear_item("source_paths")
+
+
 def update_source(files: List[File]) -> Tuple[gradio.File, gradio.Textbox]:
     file_names = [file.name for file in files] if files else None
     has_source_image = has_image(file_names)
 
     if has_source_image:
-        state_manager.set_item("source_paths", file_names)
+        _set_source_paths(file_names)
         display_value = file_names[0] if file_names else ""
         return gradio.update(value=file_names), gradio.update(value=display_value)
 
-    state_manager.clear_item("source_paths")
+    _set_source_paths(None)
     return gradio.update(value=None), gradio.update(value="")
 
 
-def _list_images_in_dir(dir_path: str) -> List[str]:
-    if not dir_path:
+# 图片扩展名判定：预编译忽略大小写的正则，单次 search 同时覆盖
+# 提取扩展名与大小写归一，省去 splitext/lower 的字符串分配
+_EXT_RE = re.compile(r"\.(jpe?g|png|bmp|webp|tiff?)$", re.IGNORECASE)
+
+
+def _has_image_ext(name: str) -> bool:
+    return _EXT_RE.search(name) is not None
+
+
+# Gallery 缩略图缓存：按 路径+mtime 哈希落盘，前端只传小图
+_THUMBS_DIR = Path(".temp/facefusion/thumbs")
+_THUMB_SIZE = 256
+
+
+def _thumbnail_for(path: str) -> str:
+    try:
+        stat = os.stat(path)
+        digest = hashlib.blake2b(
+            f"{path}:{stat.st_mtime_ns}".encode(), digest_size=16
+        ).hexdigest()
+        thumb_path = _THUMBS_DIR / f"{digest}.jpg"
+        if not thumb_path.exists():
+            image = cv2.imread(path, cv2.IMREAD_REDUCED_COLOR_4)
+            if image is None:
+                return path
+            height, width = image.shape[:2]
+            longest = max(height, width)
+            if longest > _THUMB_SIZE:
+                scale = _THUMB_SIZE / longest
+                image = cv2.resize(
+                    image,
+                    (max(1, round(width * scale)), max(1, round(height * scale))),
+                )
+            _THUMBS_DIR.mkdir(parents=True, exist_ok=True)
+            cv2.imwrite(str(thumb_path), image, [cv2.IMWRITE_JPEG_QUALITY, 70])
+        return str(thumb_path)
+    except Exception:
+        return path
+
+
+def _thumbnails_for(image_paths: List[str]) -> List[str]:
+    if not image_paths:
         return []
-    p = Path(dir_path)
-    if not p.exists() or not p.is_dir():
+    # JPEG 解码会释放 GIL，线程池并行生成缩略图
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        return list(executor.map(_thumbnail_for, image_paths))
+
+
+# Gallery 首屏只需要有限数量的磁贴，超大目录按 top-N 截断
+_GALLERY_LIMIT = 200
+
+
+def _list_images_in_dir(dir_path: str, limit: Optional[int] = None) -> List[str]:
+    if not dir_path:
         return []
-    exts = {".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff"}
+    # os.scandir 的 DirEntry 直接携带 readdir 的类型信息，省去逐项 stat
     files: List[str] = []
     try:
-        for item in p.iterdir():
-            if item.is_file() and item.suffix.lower() in exts:
-                files.append(str(item))
-    except Exception:
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False) and _has_image_ext(
+                    entry.name
+                ):
+                    files.append(entry.path)
+    except OSError:
         return []
+    if limit is not None:
+        # O(N log K) 且不必物化整个有序列表
+        return heapq.nsmallest(limit, files)
     return sorted(files)
 
 
-def _list_images_recursive(dir_path: str) -> List[str]:
-    exts = {".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff"}
-    files: List[str] = []
-    p = Path(dir_path)
-    if not p.exists() or not p.is_dir():
+# 并行扫描时直接跳过的目录（版本库/依赖目录等，不可能有源图片）
+_SKIP_DIR_NAMES = frozenset({".git", "node_modules", "__pycache__"})
+
+
+def _scan_images_parallel(dir_path: str, max_workers: int = 8) -> List[str]:
+    """每个子目录一个 scandir 任务：网络盘/深目录树上并行等待 I/O。"""
+    files: deque = deque()
+    visited: set = set()
+
+    def _scan(current: str) -> List[str]:
+        subdirs: List[str] = []
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    # 不跟随符号链接，自然避免循环，无需记录 inode
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name in _SKIP_DIR_NAMES:
+                            continue
+                        subdirs.append(entry.path)
+                    elif entry.is_file(
+                        follow_symlinks=False
+                    ) and _has_image_ext(entry.name):
+                        files.append(entry.path)
+        except OSError:
+            pass
+        return subdirs
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {executor.submit(_scan, dir_path)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for subdir in future.result():
+                    if subdir not in visited:
+                        visited.add(subdir)
+                        pending.add(executor.submit(_scan, subdir))
+    return list(files)
+
+
+@functools.lru_cache(maxsize=64)
+def _list_images_recursive_cached(dir_path: str, mtime_ns: int) -> Tuple[str, ...]:
+    return tuple(_scan_images_parallel(dir_path))
+
+
+def _list_images_recursive(dir_path: str, limit: Optional[int] = None) -> List[str]:
+    if not dir_path:
         return []
-    for root, _, filenames in os.walk(p):
-        for name in filenames:
-            if Path(name).suffix.lower() in exts:
-                files.append(str(Path(root) / name))
+    # 以 (路径, mtime_ns) 为键：目录未变时重选同一文件夹零扫描，变化即自然失效
+    try:
+        mtime_ns = os.stat(dir_path).st_mtime_ns
+    except OSError:
+        return []
+    files = _list_images_recursive_cached(dir_path, mtime_ns)
+    if limit is not None:
+        return heapq.nsmallest(limit, files)
     return sorted(files)
 
 
-def update_gallery_from_dir_upload(dir_value: Any):
-    dir_path: Optional[str] = None
-    raw = None
-    if isinstance(dir_value, list):
-        raw = dir_value
-        image_paths: List[str] = []
-        for item in dir_value:
-            if isinstance(item, str):
-                image_paths.append(item)
-            elif isinstance(item, dict):
-                candidate = (
-                    item.get("path") or item.get("file_path") or item.get("name")
-                )
-                if isinstance(candidate, str):
-                    image_paths.append(candidate)
-        image_paths = [p for p in image_paths if _is_image_path(p)]
-        debug_payload = {
-            "raw_type": "list",
-            "raw_count": len(raw),
-            "resolved_dir_path": None,
-            "image_count": len(image_paths),
-        }
-        # 依据当前 debug 状态与是否有图片来更新可见性
-        try:
-            debug_enabled_current = bool(
-                state_manager.get_item("debug_enabled") or False
-            )
-        except Exception:
-            debug_enabled_current = False
-        if debug_enabled_current:
-            show_dir = True
-            show_toggle = True
+# 画廊分页状态：完整路径列表留在服务端，前端每次只收一页缩略图
+_GALLERY_PAGE_SIZE = 48
+_gallery_pager = {"paths": [], "shown": 0}
+
+
+def _gallery_updates(image_paths: List[str], debug_payload: dict):
+    # 依据当前 debug 状态与是否有图片来更新目录/开关可见性
+    debug_enabled_current = _debug_enabled()
+    show_controls = debug_enabled_current or not image_paths
+    shown = min(len(image_paths), _GALLERY_PAGE_SIZE)
+    _gallery_pager["paths"] = image_paths
+    _gallery_pager["shown"] = shown
+    return (
+        gradio.update(
+            value=_thumbnails_for(image_paths[:shown]), visible=len(image_paths) > 0
+        ),
+        # 调试面板关闭时既不序列化也不下发值，槽位收到空更新
+        gradio.update(value=_DEBUG_ENCODE(debug_payload))
+        if debug_enabled_current
+        else gradio.update(),
+        gradio.update(visible=show_controls),
+        gradio.update(visible=show_controls),
+        gradio.update(visible=shown < len(image_paths)),
+    )
+
+
+def _original_for_index(index: Any) -> Optional[str]:
+    # Gradio 会把 Gallery 文件拷贝进自己的缓存目录再下发，事件里的路径
+    # 对不上服务端的缩略图路径；按选中序号回查 pager 里的原图列表才可靠
+    # （Gallery 的展示顺序与发送顺序一致）
+    paths = _gallery_pager["paths"]
+    if isinstance(index, int) and 0 <= index < len(paths):
+        return paths[index]
+    return None
+
+
+def on_gallery_more():
+    # 追加下一页：重发 前 shown+页长 的缩略图（缩略图已有磁盘缓存，重发只付路径）
+    paths = _gallery_pager["paths"]
+    shown = _gallery_pager["shown"]
+    if shown >= len(paths):
+        return gradio.update(), gradio.update(visible=False)
+    shown = min(len(paths), shown + _GALLERY_PAGE_SIZE)
+    _gallery_pager["shown"] = shown
+    return (
+        gradio.update(value=_thumbnails_for(paths[:shown])),
+        gradio.update(visible=shown < len(paths)),
+    )
+
+
+def _handle_dir_list(dir_value: list):
+    # 单次遍历完成提取+过滤+去重，调试信息只留计数，不序列化大负载
+    seen: set = set()
+    image_paths: List[str] = []
+    dir_roots: List[str] = []
+    for item in dir_value:
+        if isinstance(item, str):
+            candidate: Optional[str] = item
+        elif isinstance(item, dict):
+            candidate = item.get("path") or item.get("file_path") or item.get("name")
         else:
-            if len(image_paths) > 0:
-                show_dir = False
-                show_toggle = False
-            else:
-                show_dir = True
-                show_toggle = True
-        return (
-            gradio.update(value=image_paths, visible=len(image_paths) > 0),
-            gradio.update(
-                value=json.dumps(debug_payload, ensure_ascii=False, indent=2)
-            ),
-            gradio.update(visible=show_dir),
-            gradio.update(visible=show_toggle),
-        )
-    if isinstance(dir_value, Path):
-        raw = str(dir_value)
-        dir_value = raw
-    elif isinstance(dir_value, dict):
-        raw = dir_value
-        candidate = (
-            dir_value.get("path") or dir_value.get("file_path") or dir_value.get("name")
-        )
-        if isinstance(candidate, str):
-            dir_value = candidate
-    elif isinstance(dir_value, str):
-        raw = dir_value
-
-    if isinstance(dir_value, str):
-        if os.path.isdir(dir_value):
-            dir_path = dir_value
-        elif dir_value.lower().endswith(".zip"):
-            dir_path = _extract_zip_to_temp(dir_value)
-
-    image_paths: List[str] = _list_images_recursive(dir_path) if dir_path else []
+            candidate = None
+        if not isinstance(candidate, str) or candidate in seen:
+            continue
+        if _is_image_path(candidate):
+            seen.add(candidate)
+            image_paths.append(candidate)
+        elif os.path.isdir(candidate):
+            seen.add(candidate)
+            dir_roots.append(candidate)
+    if dir_roots:
+        # 多个根目录各自独立扫描，线程池并行等待 I/O；单根时无额外开销
+        with ThreadPoolExecutor(
+            max_workers=min(8, os.cpu_count() or 1)
+        ) as executor:
+            for files in executor.map(_list_images_recursive, dir_roots):
+                for path in files:
+                    if path not in seen:
+                        seen.add(path)
+                        image_paths.append(path)
     debug_payload = {
-        "raw": raw,
+        "raw_type": "list",
+        "raw_count": len(dir_value),
+        "dir_count": len(dir_roots),
+        "resolved_dir_path": None,
+        "image_count": len(image_paths),
+    }
+    return _gallery_updates(image_paths, debug_payload)
+
+
+def _handle_dir_str(dir_value: str, raw: Any = None):
+    raw = dir_value if raw is None else raw
+    dir_path: Optional[str] = None
+    if os.path.isdir(dir_value):
+        dir_path = dir_value
+    elif dir_value.lower().endswith(".zip"):
+        dir_path = _extract_zip_to_temp(dir_value)
+    image_paths = (
+        _list_images_recursive(dir_path, limit=_GALLERY_LIMIT) if dir_path else []
+    )
+    debug_payload = {
+        "raw_preview": str(raw)[:256],
         "resolved_dir_path": dir_path,
         "image_count": len(image_paths),
     }
-    # 依据当前 debug 状态与是否有图片来更新可见性
-    try:
-        debug_enabled_current = bool(state_manager.get_item("debug_enabled") or False)
-    except Exception:
-        debug_enabled_current = False
-    if debug_enabled_current:
-        show_dir = True
-        show_toggle = True
-    else:
-        if len(image_paths) > 0:
-            show_dir = False
-            show_toggle = False
-        else:
-            show_dir = True
-            show_toggle = True
-    return (
-        gradio.update(value=image_paths, visible=len(image_paths) > 0),
-        gradio.update(value=json.dumps(debug_payload, ensure_ascii=False, indent=2)),
-        gradio.update(visible=show_dir),
-        gradio.update(visible=show_toggle),
+    return _gallery_updates(image_paths, debug_payload)
+
+
+def _handle_dir_dict(dir_value: dict):
+    candidate = (
+        dir_value.get("path") or dir_value.get("file_path") or dir_value.get("name")
+    )
+    if isinstance(candidate, str):
+        return _handle_dir_str(candidate, raw=dir_value)
+    return _gallery_updates(
+        [],
+        {
+            "raw_preview": str(dir_value)[:256],
+            "resolved_dir_path": None,
+            "image_count": 0,
+        },
     )
 
 
+def _handle_dir_unknown(dir_value: Any):
+    # Path 的实际类型是 PosixPath/WindowsPath，精确 type 分发不命中，这里兜底
+    if isinstance(dir_value, Path):
+        return _handle_dir_str(str(dir_value))
+    return _gallery_updates(
+        [],
+        {
+            "raw_preview": str(dir_value)[:256],
+            "resolved_dir_path": None,
+            "image_count": 0,
+        },
+    )
+
+
+_DIR_HANDLERS = {
+    list: _handle_dir_list,
+    dict: _handle_dir_dict,
+    str: _handle_dir_str,
+}
+
+
+def update_gallery_from_dir_upload(dir_value: Any):
+    # 按实际类型一次分发，不再串行走多重 isinstance 链
+    return _DIR_HANDLERS.get(type(dir_value), _handle_dir_unknown)(dir_value)
+
+
 def _is_image_path(p: str) -> bool:
-    try:
-        return Path(p).suffix.lower() in {
-            ".jpg",
-            ".jpeg",
-            ".png",
-            ".bmp",
-            ".webp",
-            ".tif",
-            ".tiff",
-        }
-    except Exception:
-        return False
+    return _has_image_ext(p)
+
+
+_last_debug_flag: Optional[bool] = None
 
 
 def on_debug_toggle(flag: bool, gallery_value: Any):
+    global _last_debug_flag
+    flag = bool(flag)
+    # 快速重复切换（事件重放）时跳过状态写入与前端 diff
+    if flag == _last_debug_flag:
+        return tuple(gradio.update() for _ in range(6))
+    _last_debug_flag = flag
     try:
-        state_manager.set_item("debug_enabled", bool(flag))
+        state_manager.set_item("debug_enabled", flag)
     except Exception:
         pass
     # 计算目录与调试开关、图库的可见性（平滑无闪烁，仅控制可见性）
@@ -386,7 +568,7 @@ def on_debug_toggle(flag: bool, gallery_value: Any):
     except Exception:
         has_source_image = False
 
-    if bool(flag):
+    if flag:
         show_dir = True
         show_toggle = True
         # Gallery 仅在已有图片时显示
@@ -401,10 +583,11 @@ def on_debug_toggle(flag: bool, gallery_value: Any):
             show_toggle = True
             show_gallery = False
 
+    debug_update = gradio.update(visible=flag)
     return (
-        gradio.update(visible=bool(flag)),
-        gradio.update(visible=bool(flag)),
-        gradio.update(visible=bool(flag)),
+        debug_update,
+        debug_update,
+        debug_update,
         gradio.update(visible=show_dir),
         gradio.update(visible=show_toggle),
         gradio.update(visible=show_gallery),
@@ -415,50 +598,59 @@ def on_gallery_select(
     evt: gradio.SelectData,
 ) -> Tuple[gradio.File, gradio.Textbox, gradio.Textbox]:
     # 当 Gallery 使用路径列表作为 value 时，evt.value 即选中的文件路径
-    try:
-        selected_path = evt.value  # type: ignore[attr-defined]
-    except Exception:
-        selected_path = None
-    try:
-        debug_text = json.dumps(
-            {
-                "index": getattr(evt, "index", None),
-                "value": getattr(evt, "value", None),
-            },
-            ensure_ascii=False,
-            indent=2,
-        )
-    except Exception:
-        debug_text = str(evt)
+    selected_path = getattr(evt, "value", None)
+    index = getattr(evt, "index", None)
+    # 调试面板关闭时不做任何序列化，调试槽位返回空更新即可
+    if not _debug_enabled():
+        debug_text = None
+    else:
+        try:
+            if isinstance(selected_path, dict) and len(str(selected_path)) > 512:
+                # 大负载（可能内嵌 base64）只记录键名，不整体序列化
+                debug_text = _DEBUG_ENCODE(
+                    {
+                        "index": index,
+                        "value_type": "dict",
+                        "keys": list(selected_path)[:8],
+                    }
+                )
+            else:
+                debug_text = _DEBUG_ENCODE({"index": index, "value": selected_path})
+        except Exception:
+            debug_text = str(evt)[:512]
+    debug_update = (
+        gradio.update() if debug_text is None else gradio.update(value=debug_text)
+    )
 
     if isinstance(selected_path, str):
-        path_str = selected_path
-        state_manager.set_item("source_paths", [path_str])
+        # Gallery 展示的是缩略图，这里映射回原图路径
+        path_str = _original_for_index(index) or selected_path
+        _set_source_paths([path_str])
         return (
             gradio.update(value=[path_str], visible=False),
             gradio.update(value=path_str),
-            gradio.update(value=debug_text),
+            debug_update,
         )
     if isinstance(selected_path, dict):
-        path = (
+        path = _original_for_index(index) or (
             selected_path.get("path")
             or selected_path.get("name")
             or selected_path.get("video", {}).get("path")
             or selected_path.get("image", {}).get("path")
         )
         if isinstance(path, str):
-            state_manager.set_item("source_paths", [path])
+            _set_source_paths([path])
             return (
                 gradio.update(value=[path], visible=False),
                 gradio.update(value=path),
-                gradio.update(value=debug_text),
+                debug_update,
             )
 
-    state_manager.clear_item("source_paths")
+    _set_source_paths(None)
     return (
         gradio.update(value=None, visible=False),
         gradio.update(value=""),
-        gradio.update(value=debug_text),
+        debug_update,
     )
 
 
@@ -469,7 +661,34 @@ def _extract_zip_to_temp(zip_path: str) -> str:
         dst = base / uuid4().hex
         dst.mkdir(parents=True, exist_ok=True)
         with zipfile.ZipFile(zip_path, "r") as zf:
-            zf.extractall(dst)
+            # 只解压图片成员：画廊后续扫描只认图片，其余成员解了也是白写盘
+            members = [
+                m
+                for m in zf.infolist()
+                if not m.is_dir() and _has_image_ext(m.filename)
+            ]
+            # 打平目录层级，文件统一落在目标根目录；重名成员串接序号避免互相覆盖
+            targets: list = []
+            seen_names: set = set()
+            for member in members:
+                name = Path(member.filename).name
+                if name in seen_names:
+                    stem, ext = os.path.splitext(name)
+                    index = 1
+                    while f"{stem}_{index}{ext}" in seen_names:
+                        index += 1
+                    name = f"{stem}_{index}{ext}"
+                seen_names.add(name)
+                targets.append((member, dst / name))
+
+            # 逐成员流式解压；ZipFile.open 可多线程并发读，解压+写盘并行执行
+            def _extract_one(item) -> None:
+                member, out_path = item
+                with zf.open(member) as src, open(out_path, "wb") as out:
+                    shutil.copyfileobj(src, out, 1 << 20)
+
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(_extract_one, targets))
         return str(dst)
     except Exception:
         return ""
@@ -511,28 +730,101 @@ def start(
         )  # type:ignore[arg-type]
     webcam_width, webcam_height = unpack_resolution(webcam_resolution)
 
+    # 预分配管道写出缓冲：复用同一块内存，免去每帧 tobytes() 的分配与拷贝
+    pipe_view = None
+    pipe_frame = None
+    pipe_fd = None
+    if stream is not None:
+        pipe_buf = bytearray(webcam_width * webcam_height * 3)
+        pipe_view = memoryview(pipe_buf)
+        pipe_frame = numpy.frombuffer(pipe_buf, dtype=numpy.uint8).reshape(
+            webcam_height, webcam_width, 3
+        )
+        if hasattr(os, "writev") and hasattr(stream.stdin, "fileno"):
+            try:
+                pipe_fd = stream.stdin.fileno()
+            except Exception:
+                pipe_fd = None
+
+    # 监视器落盘与 FFmpeg 写出放到后台线程，磁盘/管道抖动不再拖慢采集与显示
+    sink_queue: queue.Queue = queue.Queue(maxsize=2)
+    sink_stop = threading.Event()
+
+    def _sink() -> None:
+        global _last_save_ts
+        # 前置条件只判断一次；失败后翻转标志位，不再每帧进出异常处理
+        save_ok = True
+        stream_ok = stream is not None and stream.stdin is not None
+        while not sink_stop.is_set():
+            try:
+                sink_frame = sink_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            # 写入监视器缓存文件，供 MJPEG 路由使用（限速到消费端帧率）
+            now = time.monotonic()
+            if save_ok and now - _last_save_ts >= _MIN_SAVE_INTERVAL:
+                try:
+                    # 队列里是 BGR 原始帧，走直通版本免去一次通道转换
+                    save_latest_frame_bgr(sink_frame)
+                except OSError:
+                    save_ok = False
+                _last_save_ts = now
+            if stream_ok:
+                try:
+                    # FFmpeg 管道按 RGB 进料：copyto 接受负步长视图，仍是单次拷贝
+                    numpy.copyto(pipe_frame, sink_frame[:, :, ::-1])
+                    if pipe_fd is not None:
+                        os.writev(pipe_fd, [pipe_view])
+                    else:
+                        stream.stdin.write(pipe_view)
+                except (OSError, ValueError):
+                    # FFmpeg 退出（管道破裂）或尺寸不符后停写
+                    stream_ok = False
+
     if camera_capture and camera_capture.isOpened():
+        sink_thread = threading.Thread(target=_sink, daemon=True)
+        sink_thread.start()
         camera_capture.set(cv2.CAP_PROP_FRAME_WIDTH, webcam_width)
         camera_capture.set(cv2.CAP_PROP_FRAME_HEIGHT, webcam_height)
         camera_capture.set(cv2.CAP_PROP_FPS, webcam_fps)
+        try:
+            # 限制驱动缓冲为 1 帧，消除数帧的端到端延迟；属性随后端而定，失败可忽略
+            camera_capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            # MJPG 采集避免驱动侧 YUYV 软件转换
+            camera_capture.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+        except Exception:
+            pass
 
-        for capture_frame in multi_process_capture(camera_capture, webcam_fps):
-            capture_frame = cv2.cvtColor(capture_frame, cv2.COLOR_BGR2RGB)
-            # 写入监视器缓存文件，供 MJPEG 路由使用
-            try:
-                save_latest_frame(capture_frame)
-            except Exception:
-                pass
-
-            if webcam_mode == "inline":
-                yield capture_frame
-            else:
+        try:
+            for capture_frame in multi_process_capture(camera_capture, webcam_fps):
+                # sink 线程直接拿 BGR 原始引用：监视器 JPEG 编码免通道转换，
+                # 管道写出在 sink 内按需翻转；最新帧优先，队列满则丢最旧的一帧
                 try:
-                    stream.stdin.write(capture_frame.tobytes())
-                except Exception:
-                    pass
-
-
-def stop() -> gradio.Image:
+                    sink_queue.put_nowait(capture_frame)
+                except queue.Full:
+                    try:
+                        sink_queue.get_nowait()
+                    except queue.Empty:
+                        pass
+                    try:
+                        sink_queue.put_nowait(capture_frame)
+                    except queue.Full:
+                        pass
+
+                if webcam_mode == "inline":
+                    # BGR→RGB 只建立负步长视图，Gradio 接受非连续数组
+                    yield capture_frame[:, :, ::-1]
+        finally:
+            sink_stop.set()
+            sink_thread.join(timeout=1.0)
+
+
+def stop_and_pre_stop() -> Tuple[gradio.File, gradio.Image, gradio.Button, gradio.Button]:
+    # 停止采集（清帧）与 pre_stop 的可见性复位合并：少一次独立的事件往返
     clear_camera_pool()
-    return gradio.Image(value=None)
+    return (
+        gradio.File(visible=False),
+        gradio.Image(value=None, visible=False),
+        gradio.Button(visible=True),
+        gradio.Button(visible=False),
+    )
@@ -2,7 +2,7 @@
 监视器集成（monitor_integration）
 
 用途概述：
-- 将 Webcam 捕获到的 RGB 帧转存为 JPEG 文件 `latest.jpg`，目录为 `.temp/monitor`；
+- 将 Webcam 捕获到的 BGR 帧编码为 JPEG 并发布（进程内槽位/共享内存/`latest.jpg`）；
 - 提供一个简单的 MJPEG（multipart/x-mixed-replace）生成器，从 `latest.jpg` 持续读取并推流；
 - 在 Gradio 所使用的 FastAPI/Starlette 应用上挂载路由（默认 `/monitor/mjpeg`），供浏览器或 OBS 订阅。
 
@@ -14,7 +14,11 @@
 
 import os
 import asyncio
-from typing import Optional, AsyncGenerator
+import queue
+import struct
+import threading
+from multiprocessing import shared_memory
+from typing import Optional, AsyncGenerator, Tuple
 
 import cv2
 from starlette.responses import StreamingResponse
@@ -22,6 +26,105 @@ from starlette.responses import StreamingResponse
 from facefusion import logger, state_manager
 from facefusion.filesystem import create_directory, is_file
 
+# 共享内存帧交换区：采集端把 JPEG 写入该块，MJPEG 路由直接读取，
+# 免去每帧的磁盘写+读往返；创建失败时回退到 latest.jpg 文件方案。
+_SHM_NAME = "ff_latest_frame"
+_SHM_SIZE = 1 << 20
+# 头部布局 <II：JPEG 字节数、帧序号
+_SHM_HEADER = 8
+_shm: Optional[shared_memory.SharedMemory] = None
+_shm_seq = 0
+
+# 进程内最新帧槽位：单生产者覆盖写，MJPEG 生成器按序号等待新帧，
+# 同进程推流完全不经过共享内存/磁盘；seq 单调递增用于判断“有没有新帧”。
+_LATEST = {"jpeg": b"", "seq": 0}
+_LATEST_COND = threading.Condition()
+
+# 事件驱动推流：每个已连接的 MJPEG 客户端注册一个 asyncio.Event，
+# 编码线程发布新帧后经 call_soon_threadsafe 统一置位，生成器端
+# 无需占用线程池线程做阻塞等待，帧到达即推送。
+_event_loop: Optional[asyncio.AbstractEventLoop] = None
+_client_events: set = set()
+
+
+def _wake_clients() -> None:
+    # 仅在事件循环线程内调用
+    for event in _client_events:
+        event.set()
+
+
+def _publish_frame(jpeg_bytes: bytes) -> None:
+    with _LATEST_COND:
+        _LATEST["jpeg"] = jpeg_bytes
+        _LATEST["seq"] += 1
+        _LATEST_COND.notify_all()
+    loop = _event_loop
+    if loop is not None and _client_events:
+        try:
+            loop.call_soon_threadsafe(_wake_clients)
+        except RuntimeError:
+            # 事件循环已关闭（进程退出中）
+            pass
+
+
+def _latest_frame() -> Tuple[int, bytes]:
+    with _LATEST_COND:
+        return _LATEST["seq"], _LATEST["jpeg"]
+
+
+def _get_shm(create: bool = True) -> Optional[shared_memory.SharedMemory]:
+    global _shm
+    if _shm is not None:
+        return _shm
+    try:
+        _shm = shared_memory.SharedMemory(name=_SHM_NAME)
+    except FileNotFoundError:
+        if not create:
+            return None
+        try:
+            _shm = shared_memory.SharedMemory(
+                create=True, size=_SHM_SIZE, name=_SHM_NAME
+            )
+        except Exception:
+            return None
+    except Exception:
+        return None
+    return _shm
+
+
+def _write_shm_frame(jpeg_bytes: bytes) -> bool:
+    global _shm_seq
+    shm = _get_shm()
+    if shm is None or len(jpeg_bytes) > shm.size - _SHM_HEADER:
+        return False
+    # seqlock：写入前先把序号置为奇数（写入中），载荷就位后写回偶数；
+    # 读取端复制后重读头部，序号有变/为奇即视为撕裂读并重试
+    next_seq = (_shm_seq + 2) & 0xFFFFFFFE
+    struct.pack_into("<II", shm.buf, 0, len(jpeg_bytes), next_seq | 1)
+    shm.buf[_SHM_HEADER:_SHM_HEADER + len(jpeg_bytes)] = jpeg_bytes
+    struct.pack_into("<II", shm.buf, 0, len(jpeg_bytes), next_seq)
+    _shm_seq = next_seq
+    return True
+
+
+def _read_shm_frame() -> Optional[bytes]:
+    shm = _get_shm(create=False)
+    if shm is None:
+        return None
+    # 撕裂读窗口极窄，重试两次足以跨过一次并发写入
+    for _ in range(3):
+        length, seq = struct.unpack_from("<II", shm.buf, 0)
+        if seq & 1:
+            # 写入进行中
+            continue
+        if not length or length > shm.size - _SHM_HEADER:
+            return None
+        data = bytes(shm.buf[_SHM_HEADER:_SHM_HEADER + length])
+        length_check, seq_check = struct.unpack_from("<II", shm.buf, 0)
+        if seq_check == seq and length_check == length:
+            return data
+    return None
+
 
 def _monitor_dir_path() -> str:
     # 监视器缓存目录：优先使用 state_manager 中的临时目录；
@@ -43,61 +146,187 @@ def ensure_monitor_dir() -> bool:
         return False
 
 
-def save_latest_frame(frame) -> None:
-    """
-    将 RGB 帧保存为 `.temp/monitor/latest.jpg`（JPEG 格式）。
+# 磁盘回退通道的持久 fd：免去每帧的 open/close 系统调用与路径解析。
+# pread/pwrite 在 Windows 上不可用，届时回退到逐次 open 的旧路径。
+_HAS_PIO = hasattr(os, "pwrite") and hasattr(os, "pread")
+_disk_write_fd: Optional[int] = None
+_disk_read_fd: Optional[int] = None
 
-    使用说明：
-    - 输入 `frame` 期望为 RGB（与 Webcam 捕获循环保持一致）；
-    - 为适配 OpenCV 的 JPEG 编码，先转换为 BGR；
-    - 内部异常被吞噬并打到 debug 日志，避免打断采集循环。
 
-    Notes (English):
-    - Input frame is expected in RGB (as produced by webcam capture loop).
-    - Converts to BGR for OpenCV JPEG encoding.
-    - Silently ignores errors to avoid breaking the capture loop.
-    """
-    try:
-        ensure_monitor_dir()
-        # OpenCV 的大多数图像处理 API 以 BGR 为默认通道顺序；
-        # 因此先将 RGB 转换为 BGR。
-        bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-        # 将图像编码为 JPEG 二进制缓存。
-        ok, buf = cv2.imencode(".jpg", bgr)
-        if not ok:
-            return
-        # 将编码后的数据写入 `latest.jpg`。
+def _write_disk_frame(data: bytes) -> None:
+    global _disk_write_fd
+    ensure_monitor_dir()
+    if not _HAS_PIO:
         with open(_monitor_file_path(), "wb") as f:
-            f.write(buf.tobytes())
-    except Exception as e:
-        logger.debug(f"[monitor_integration] save_latest_frame failed: {e}", __name__)
+            f.write(data)
+        return
+    try:
+        if _disk_write_fd is None:
+            _disk_write_fd = os.open(
+                _monitor_file_path(), os.O_WRONLY | os.O_CREAT, 0o644
+            )
+        os.pwrite(_disk_write_fd, data, 0)
+        # 新帧比旧帧小则截断，避免残留旧帧尾部字节
+        os.ftruncate(_disk_write_fd, len(data))
+    except OSError:
+        # fd 失效（目录被清理等）：下一帧重新打开
+        _disk_write_fd = None
+        raise
 
 
-async def _mjpeg_generator(frame_interval_sec: float = 0.04) -> AsyncGenerator[bytes, None]:
-    # MJPEG 边界标识；浏览器/OBS 会根据该边界解析多帧 JPEG。
-    boundary = b"--frame"
+def _read_disk_frame() -> Optional[bytes]:
+    global _disk_read_fd
+    file_path = _monitor_file_path()
+    if not _HAS_PIO:
+        if is_file(file_path):
+            try:
+                with open(file_path, "rb") as f:
+                    return f.read()
+            except OSError:
+                return None
+        return None
+    try:
+        if _disk_read_fd is None:
+            _disk_read_fd = os.open(file_path, os.O_RDONLY)
+        # 磁盘通道恰恰要兜住放不进共享内存的超大 JPEG，按文件实际大小读
+        size = os.fstat(_disk_read_fd).st_size
+        return os.pread(_disk_read_fd, size, 0) or None
+    except OSError:
+        _disk_read_fd = None
+        return None
+
+
+# 监视器流定位为低延迟预览：默认质量 75，关闭 optimize/progressive
+# （两者都会增加每帧 CPU 编码耗时，对推流场景收益为零）。
+_JPEG_DEFAULT_QUALITY = 75
+_jpeg_params_cache: Tuple[int, list] = (_JPEG_DEFAULT_QUALITY, [])
+
+
+def _jpeg_encode_params() -> list:
+    global _jpeg_params_cache
+    quality = state_manager.get_item("monitor_jpeg_quality") or _JPEG_DEFAULT_QUALITY
+    if _jpeg_params_cache[1] and _jpeg_params_cache[0] == quality:
+        return _jpeg_params_cache[1]
+    params = [
+        cv2.IMWRITE_JPEG_QUALITY, int(quality),
+        cv2.IMWRITE_JPEG_OPTIMIZE, 0,
+        cv2.IMWRITE_JPEG_PROGRESSIVE, 0,
+    ]
+    _jpeg_params_cache = (quality, params)
+    return params
+
+
+# 单槽编码队列：调用方只做一次入队（满则丢旧帧），JPEG 编码与发布
+# 全部发生在独立 worker 线程里，采集/写出线程不再背编码开销。
+_encode_queue: queue.Queue = queue.Queue(maxsize=1)
+_encoder_started = False
+_encoder_lock = threading.Lock()
+
+
+def _encoder_worker() -> None:
     while True:
+        frame = _encode_queue.get()
         try:
-            file_path = _monitor_file_path()
-            if is_file(file_path):
-                try:
-                    # 每一轮从磁盘读取最新的 JPEG，再按 MJPEG 规范拼接响应块：
-                    # --frame\r\n
-                    # Content-Type: image/jpeg\r\n\r\n
-                    # <JPEG BYTES>\r\n
-                    with open(file_path, "rb") as f:
-                        jpg = f.read()
-                    yield boundary + b"\r\nContent-Type: image/jpeg\r\n\r\n" + jpg + b"\r\n"
-                except Exception as e:
-                    logger.debug(f"[monitor_integration] read latest.jpg failed: {e}", __name__)
-            # 控制帧间隔，避免频繁读取造成 I/O 压力。
-            await asyncio.sleep(frame_interval_sec)
+            ok, buf = cv2.imencode(".jpg", frame, _jpeg_encode_params())
+            if not ok:
+                continue
+            data = buf.tobytes()
+            # 进程内槽位是首选通道：同进程的 MJPEG 生成器据此被唤醒。
+            _publish_frame(data)
+            # 共享内存供跨进程消费；两者都不可用（或显式要求持久化）时才落盘。
+            wrote_shm = _write_shm_frame(data)
+            if not wrote_shm or state_manager.get_item("monitor_persist"):
+                _write_disk_frame(data)
         except Exception as e:
-            logger.error(f"[monitor_integration] mjpeg generator error: {e}", __name__)
-            await asyncio.sleep(frame_interval_sec)
+            logger.debug(f"[monitor_integration] encoder worker failed: {e}", __name__)
+
+
+def _ensure_encoder() -> None:
+    global _encoder_started
+    if _encoder_started:
+        return
+    with _encoder_lock:
+        if not _encoder_started:
+            threading.Thread(
+                target=_encoder_worker, name="monitor-encoder", daemon=True
+            ).start()
+            _encoder_started = True
+
+
+def save_latest_frame_bgr(frame) -> None:
+    """
+    发布采集端的原始 BGR 帧（imencode 本身就按 BGR 解释输入，无需转换）。
+    实际编码在后台 worker 完成，本函数只是近零成本的帧交接。
+    """
+    _ensure_encoder()
+    try:
+        _encode_queue.put_nowait(frame)
+    except queue.Full:
+        # 编码落后于采集：丢掉旧帧，监视器永远显示最新画面
+        try:
+            _encode_queue.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            _encode_queue.put_nowait(frame)
+        except queue.Full:
+            pass
+
+
+# MJPEG 多部分响应的固定头尾（按 `--frame` 边界解析）。
+# 分三块 yield：头/尾是常量字节串，JPEG 载荷原样透传，
+# 每帧不再为 `头 + 载荷 + 尾` 拼接出一个一次性大字节串。
+_MJPEG_HEADER = b"--frame\r\nContent-Type: image/jpeg\r\n\r\n"
+_MJPEG_TAIL = b"\r\n"
+
+
+async def _mjpeg_generator(frame_interval_sec: float = 0.04) -> AsyncGenerator[bytes, None]:
+    global _event_loop
+    _event_loop = asyncio.get_event_loop()
+    new_frame = asyncio.Event()
+    _client_events.add(new_frame)
+    last_seq = 0
+    try:
+        while True:
+            try:
+                # 等待编码线程置位；超时兜底覆盖“生产者在其他进程”的场景。
+                try:
+                    await asyncio.wait_for(new_frame.wait(), frame_interval_sec)
+                except asyncio.TimeoutError:
+                    pass
+                new_frame.clear()
+                seq, jpg = _latest_frame()
+                if seq != last_seq and jpg:
+                    last_seq = seq
+                    yield _MJPEG_HEADER
+                    yield jpg
+                    yield _MJPEG_TAIL
+                    continue
+                # 超时无新帧：回退共享内存/磁盘文件。
+                # 上面的等待已提供帧间隔的节流，这里无需再 sleep。
+                jpg = _read_shm_frame()
+                if jpg is None:
+                    jpg = _read_disk_frame()
+                if jpg:
+                    yield _MJPEG_HEADER
+                    yield jpg
+                    yield _MJPEG_TAIL
+            except Exception as e:
+                logger.error(f"[monitor_integration] mjpeg generator error: {e}", __name__)
+                await asyncio.sleep(frame_interval_sec)
+    finally:
+        _client_events.discard(new_frame)
+
+
+# MJPEG 路由的默认帧间隔（25fps）；采集侧的落帧限速据此对齐
+MONITOR_FRAME_INTERVAL_SEC = 0.04
 
 
-def mount(app, route_path: str = "/monitor/mjpeg", frame_interval_sec: float = 0.04) -> None:
+def mount(
+    app,
+    route_path: str = "/monitor/mjpeg",
+    frame_interval_sec: float = MONITOR_FRAME_INTERVAL_SEC,
+) -> None:
     """
     在 Gradio 使用的 FastAPI/Starlette 应用上挂载 MJPEG 路由。
 